@@ -1,6 +1,16 @@
 import pygame
-from queue import PriorityQueue
+from heapq import heappush, heappop
+from array import array
 import sys
+from time import perf_counter
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    # Numba is optional, without it the search runs in plain Python
+    njit = None
 
 WIDTH = 800
 screen = pygame.display.set_mode((WIDTH,WIDTH))
@@ -15,16 +25,39 @@ yellow = (237,175,31) # End node
 white = (255,255,255) # Path nodes
 grey = (142,166,180) # Filler between nodes
 
+# Node states, COLORS gives the color each one is drawn in
+S_DEFAULT = 0
+S_OPEN = 1
+S_CLOSED = 2
+S_WALL = 3
+S_START = 4
+S_END = 5
+S_PATH = 6
+# Converted once so fills don't convert the tuples on every call
+COLORS = tuple(pygame.Color(color) for color in (default, cyan, turquoise, black, blue, yellow, white))
+
+INF = 1 << 30 # Score of a node no search has reached yet
+FRAME_TIME = 1/60 # Seconds between frames while a search animates
+
 class Node:
-    def __init__(self, row, col, width, total_rows):
+    """A view of one cell, its state lives in the GridState arrays"""
+    def __init__(self, row, col, width, total_rows, states, walls):
         self.row = row
         self.col = col
+        # Position in the flat per-node arrays
+        self.idx = row*total_rows + col
         self.x = row*width
         self.y = col*width
-        self.color = default
-        self.neighbors = []
         self.width = width
+        self.rect = pygame.Rect(self.x, self.y, width, width)
         self.total_rows = total_rows
+        # Shared state and wall bitmap of the grid, kept in sync by the make_* methods
+        self.states = states
+        self.walls = walls
+
+    @property
+    def state(self):
+        return self.states[self.idx]
     
     def get_pos(self):
         """Returns the position of the node as (x,y)"""
@@ -32,145 +65,423 @@ class Node:
     
     def is_closed(self):
         """Return if we are not looking at the node anymore"""
-        return self.color == turquoise
+        return self.state == S_CLOSED
     
     def is_open(self):
         """Return if node is in the open set"""
-        return self.color == cyan
+        return self.state == S_OPEN
 
     def is_wall(self):
         """Returns if node cannot be considered/is a barrier to the path"""
-        return self.color == black
+        return self.state == S_WALL
     
     def is_end(self):
         """Returns if we have reached the final destination"""
-        return self.color == yellow
+        return self.state == S_END
     
     def reset(self):
         """Resets node state after traversal"""
-        self.color = default
+        self.states[self.idx] = S_DEFAULT
+        self.walls[self.idx] = 0
 
     def make_start(self):
-        self.color = blue
+        self.states[self.idx] = S_START
+        self.walls[self.idx] = 0
 
     def make_closed(self):
-        self.color = turquoise
+        self.states[self.idx] = S_CLOSED
 
     def make_open(self):
-        self.color = cyan
+        self.states[self.idx] = S_OPEN
     
     def make_wall(self):
-        self.color = black
+        self.states[self.idx] = S_WALL
+        self.walls[self.idx] = 1
     
     def make_end(self):
-        self.color = yellow
+        self.states[self.idx] = S_END
+        self.walls[self.idx] = 0
     
     def make_path(self):
         """Final path will be white"""
-        self.color = white
+        self.states[self.idx] = S_PATH
     
     def draw(self,screen):
         """Draws pygame rects to represent the nodes"""
-        pygame.draw.rect(screen, self.color, (self.x,self.y,self.width,self.width))
-    
-    def update_neighbors(self,grid):
-        """Finds the neighbors for a given node"""
-        self.neighbors = []
+        screen.fill(COLORS[self.state], self.rect)
+
+def build_neighbors(walls, rows):
+    """Finds the Node.idx of the neighbors of every node, indexed by Node.idx
+
+    The table only depends on the walls, so it is kept between runs and
+    rebuilt when the walls change.
+    """
+    neighbors = []
+    for idx in range(rows*rows):
+        r, c = divmod(idx, rows)
+        adjacent = []
         # Moving down the rows
-        if self.row < self.total_rows-1 and not grid[self.row+1][self.col].is_wall():
-            self.neighbors.append(grid[self.row+1][self.col])
-        # Moving up the rows 
-        if self.row > 0 and not grid[self.row-1][self.col].is_wall():
-            self.neighbors.append(grid[self.row-1][self.col])
+        if r < rows-1 and not walls[idx + rows]:
+            adjacent.append(idx + rows)
+        # Moving up the rows
+        if r > 0 and not walls[idx - rows]:
+            adjacent.append(idx - rows)
         # Moving right
-        if self.col < self.total_rows-1 and not grid[self.row][self.col+1].is_wall():
-            self.neighbors.append(grid[self.row][self.col+1])
+        if c < rows-1 and not walls[idx + 1]:
+            adjacent.append(idx + 1)
         # Moving left
-        if self.col > 0 and not grid[self.row][self.col-1].is_wall():
-            self.neighbors.append(grid[self.row][self.col-1])
+        if c > 0 and not walls[idx - 1]:
+            adjacent.append(idx - 1)
+        neighbors.append(tuple(adjacent))
+    return neighbors
+
+def heuristic(r1, c1, r2, c2):
+    """Manhattan distance for the heuristic function for A* Pathfinding"""
+    return abs(r1-r2) + abs(c1-c2)
+
+def reconstruct_path(came_from, nodes, current, draw):
+    """Walks the parent indices back from current, painting the path"""
+    i = came_from[current]
+    while i >= 0:
+        nodes[i].make_path()
+        draw([nodes[i]])
+        i = came_from[i]
+
+if njit is not None:
+    # Heap entries are packed into a single int64 as (f, count, index) so the
+    # compiled heap can order them with plain integer comparisons
+    COUNT_SHIFT = 21
+    F_SHIFT = 42
+    FIELD_MASK = (1 << COUNT_SHIFT) - 1
+
+    # Same neighbor order as build_neighbors: down, up, right, left. Globals
+    # are frozen into the compiled code, so these fold into constants
+    NEIGHBOR_DR = (1, -1, 0, 0)
+    NEIGHBOR_DC = (0, 0, 1, -1)
+
+    heuristic_nb = njit(inline='always')(heuristic)
+
+    # Explicit signatures compile these once, for exactly the C-contiguous
+    # arrays replay_search passes, and the search never indexes out of bounds
+    @njit("void(int64[::1], int64, int64)", cache=True, boundscheck=False)
+    def heap_push(heap, size, key):
+        """Sifts key up into heap[:size+1]"""
+        i = size
+        while i > 0:
+            parent = (i-1) >> 1
+            if heap[parent] <= key:
+                break
+            heap[i] = heap[parent]
+            i = parent
+        heap[i] = key
+
+    @njit("int64(int64[::1], int64)", cache=True, boundscheck=False)
+    def heap_pop(heap, size):
+        """Removes and returns the smallest key in heap[:size]"""
+        top = heap[0]
+        size -= 1
+        key = heap[size]
+        i = 0
+        while True:
+            child = 2*i + 1
+            if child >= size:
+                break
+            if child+1 < size and heap[child+1] < heap[child]:
+                child += 1
+            if heap[child] >= key:
+                break
+            heap[i] = heap[child]
+            i = child
+        heap[i] = key
+        return top
+
+    @njit("Tuple((int16[:, ::1], int64, int32[::1], int32[::1], int32[::1]))"
+          "(uint8[:, ::1], int64, int64, int64, int64)", cache=True, boundscheck=False)
+    def astar_nb(walls, sr, sc, er, ec):
+        """Compiled bidirectional A* over a wall mask, mirrors algorithm()
+
+        Returns the parents of each side, the meeting index (-1 if there is
+        no path) and a log of the expansions for replay_search to animate.
+        """
+        rows, cols = walls.shape
+        n = rows*cols
+        # Surround the grid with a frame of walls so no neighbor is ever off
+        # the grid, and index the search state by position in the padded grid
+        pcols = cols + 2
+        padded = np.ones((rows + 2, pcols), np.uint8)
+        padded[1:-1, 1:-1] = walls
+        blocked = padded.ravel()
+        # Padded position -> Node.idx, for everything handed back to replay_search
+        to_node = np.full(padded.size, -1, np.int32)
+        # The end and start are fixed for the search, so the forward potential
+        # (doubled, see algorithm()) is worked out once for every node
+        potential = np.zeros(padded.size, np.int32)
+        for r in range(rows):
+            for c in range(cols):
+                to_node[(r+1)*pcols + c+1] = r*cols + c
+                potential[(r+1)*pcols + c+1] = heuristic_nb(r, c, er, ec) - heuristic_nb(r, c, sr, sc)
+        start = (sr+1)*pcols + sc+1
+        end = (er+1)*pcols + ec+1
+
+        # Row 0 searches forward from the start, row 1 backward from the end
+        sign = (1, -1)
+        g_score = np.full((2, padded.size), INF, np.int32)
+        closed = np.zeros((2, padded.size), np.uint8)
+        # int16 parents by Node.idx, same as algorithm()
+        came_from = np.full((2, n), -1, np.int16)
+        # A node is improved at most once per closed neighbor, which bounds the pushes
+        heaps = np.empty((2, 4*n + 1), np.int64)
+        sizes = np.zeros(2, np.int64)
+        count = 0
+        best = INF
+        meet = -1
+
+        # expanded[k] opened the nodes in opened[opened_upto[k-1]:opened_upto[k]]
+        expanded = np.empty(2*n, np.int32)
+        opened_upto = np.empty(2*n, np.int32)
+        opened = np.empty(2*(4*n + 1), np.int32)
+        n_expanded = 0
+        n_opened = 0
+
+        g_score[0, start] = 0
+        g_score[1, end] = 0
+        h = heuristic_nb(sr, sc, er, ec)
+        heap_push(heaps[0], 0, (h << F_SHIFT) | start)
+        heap_push(heaps[1], 0, (h << F_SHIFT) | end)
+        sizes[0] = 1
+        sizes[1] = 1
+
+        while sizes[0] and sizes[1]:
+            if (heaps[0, 0] >> F_SHIFT) + (heaps[1, 0] >> F_SHIFT) >= 2*best:
+                break
+            side = 0 if sizes[0] <= sizes[1] else 1
+            key = heap_pop(heaps[side], sizes[side])
+            sizes[side] -= 1
+            idx = key & FIELD_MASK
+            if closed[side, idx]:
+                continue
+            closed[side, idx] = 1
+
+            tmp_g = g_score[side, idx] + 1
+            for k in range(4):
+                nb = idx + NEIGHBOR_DR[k]*pcols + NEIGHBOR_DC[k]
+                if blocked[nb]:
+                    continue
+                if tmp_g < g_score[side, nb]:
+                    came_from[side, to_node[nb]] = to_node[idx]
+                    g_score[side, nb] = tmp_g
+                    count += 1
+                    heap_push(heaps[side], sizes[side],
+                              ((2*tmp_g + sign[side]*potential[nb]) << F_SHIFT) | (count << COUNT_SHIFT) | nb)
+                    sizes[side] += 1
+                    opened[n_opened] = to_node[nb]
+                    n_opened += 1
+                    if tmp_g + g_score[1-side, nb] < best:
+                        best = tmp_g + g_score[1-side, nb]
+                        meet = to_node[nb]
+
+            expanded[n_expanded] = to_node[idx]
+            opened_upto[n_expanded] = n_opened
+            n_expanded += 1
+
+        return came_from, meet, expanded[:n_expanded], opened[:n_opened], opened_upto[:n_expanded]
+else:
+    astar_nb = None
+
+def make_presenter(draw):
+    """Wraps draw so the search presents at most once per FRAME_TIME
+
+    The returned function takes the nodes recolored so far and gives back
+    the ones still waiting to be drawn.
+    """
+    last_present = perf_counter()
+
+    def present(dirty):
+        nonlocal last_present
+        now = perf_counter()
+        if now - last_present < FRAME_TIME:
+            return dirty
+        draw(dirty)
+        last_present = now
+        return []
+
+    return present
+
+def paint_path(draw, came_from, nodes, meet, end, dirty):
+    """Constructs the path out from the meeting node in both directions"""
+    nodes[meet].make_path()
+    dirty.append(nodes[meet])
+    draw(dirty)
+    reconstruct_path(came_from[0], nodes, meet, draw)
+    reconstruct_path(came_from[1], nodes, meet, draw)
+    end.make_end()
+    draw([end])
+
+def replay_search(draw, grid, start, end, cancelled):
+    """Runs the compiled search, then animates the expansions in the same order"""
+    nodes = grid.nodes
+    rows = grid.rows
+    sr, sc = start.get_pos()
+    er, ec = end.get_pos()
+    came_from, meet, expanded, opened, opened_upto = astar_nb(np.frombuffer(grid.walls, np.uint8).reshape(rows, rows), sr, sc, er, ec)
+
+    # Nodes recolored since the last frame
+    dirty = []
+    present = make_presenter(draw)
+    first = 0
+    for step, idx in enumerate(expanded, 1):
+        if step & 63 == 0:
+            if pygame.event.get(pygame.QUIT):
+                cancelled[0] = True
+                return False
+
+        current = nodes[idx]
+        for i in opened[first:opened_upto[step-1]]:
+            neighbor = nodes[i]
+            if neighbor != start and neighbor != end:
+                neighbor.make_open()
+                dirty.append(neighbor)
+        first = opened_upto[step-1]
+        dirty = present(dirty)
+
+        if current != start and current != end:
+            current.make_closed()
+            dirty.append(current)
 
-    def __lt__(self):
-        """For comparing two nodes"""
+    if meet < 0:
         return False
 
-def heuristic(p1,p2):
-    """Euclidean distance for the heuristic function for A* Pathfinding"""
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1-x2) + abs(y1-y2)
+    paint_path(draw, came_from, nodes, meet, end, dirty)
+    return True
 
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
+def algorithm(draw, grid, neighbors, start, end, cancelled):
+    """The actual pathfinding algorithm: bidirectional A*
 
-def algorithm(draw, grid, start, end):
-    """The actual pathfinding algorithm"""
-    count = 0
-    open_set = PriorityQueue()
-    # Adding the start node to the P-Queue
-    open_set.put((0, count, start))
-    came_from = {}
-
-    # Defining the f and g scores for A* Pathfinding:
-    # G: distance from the start to the current node
-    # F: perceived distance to the end, using the heuristic
-    g_score = {node: float("inf") for row in grid for node in row}
-    g_score[start] = 0
-    f_score = {node: float("inf") for row in grid for node in row}
-    f_score[start] = heuristic(start.get_pos(), end.get_pos())
-    
-    # Keeping track of items in the P-Queue
-    open_set_hash = {start}
+    One search grows from the start and one from the end. Keys use the
+    potential (h_end - h_start)/2 forwards and its negation backwards,
+    doubled to stay integral, which makes the two searches agree on what
+    the shortest path costs.
 
-    while not open_set.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
+    Closing the window stops the search early: cancelled[0] is set and
+    False is returned, leaving the caller to shut down.
+    """
+    if astar_nb is not None:
+        return replay_search(draw, grid, start, end, cancelled)
 
-    # Accessing the Node
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-        # Construct the path
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-            
-        for neighbor in current.neighbors:
-            # Assuming the neighbor one unit away is one unit further from the start
-            tmp_g = g_score[current] + 1
-
-            if tmp_g < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tmp_g
-                f_score[neighbor] = tmp_g + heuristic(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
+    count = 0
+    expanded = 0
+    # Index 0 searches forward from the start, index 1 backward from the end
+    # Heaps and per-node state hold Node.idx rather than the Nodes themselves
+    nodes = grid.nodes
+    n = len(nodes)
+    open_sets = ([], [])
+    # Parent Node.idx of each node, -1 for none. int16 holds grids up to 181x181
+    came_froms = (array('h', [-1])*n, array('h', [-1])*n)
+    # One byte per node and side, set once the node has been expanded
+    closed = (bytearray(n), bytearray(n))
+    # Adding the start and end nodes to their heaps
+    sr, sc = start.row, start.col
+    er, ec = end.row, end.col
+    heappush(open_sets[0], (heuristic(sr, sc, er, ec), count, start.idx))
+    heappush(open_sets[1], (heuristic(sr, sc, er, ec), count, end.idx))
+
+    # Twice the potential of each node, for each side. The start and end are
+    # fixed for the search, so these are worked out once up front
+    forward = [heuristic(r, c, er, ec) - heuristic(r, c, sr, sc) for r in range(grid.rows) for c in range(grid.rows)]
+    potentials = (forward, [-p for p in forward])
+
+    # G: distance from the root of each search to the current node
+    g_scores = ([INF]*n, [INF]*n)
+    g_scores[0][start.idx] = 0
+    g_scores[1][end.idx] = 0
+
+    # Cheapest start-to-end route seen so far and where the searches met on it
+    best = INF
+    meet = None
+    # Nodes recolored since the last frame
+    dirty = []
+    present = make_presenter(draw)
+
+    while open_sets[0] and open_sets[1]:
+        # The potentials cancel along any path, so once the two smallest keys
+        # reach the best meeting cost no shorter path is left to find
+        if open_sets[0][0][0] + open_sets[1][0][0] >= 2*best:
+            break
+
+        # Only QUIT matters mid-search, and every 64 expansions is often enough
+        expanded += 1
+        if expanded & 63 == 0:
+            if pygame.event.get(pygame.QUIT):
+                cancelled[0] = True
+                return False
+
+        # Grow whichever frontier is smaller
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        idx = heappop(open_sets[side])[2]
+        # Nodes are pushed again whenever a shorter route is found, so skip
+        # entries that were superseded after being queued
+        if closed[side][idx]:
+            continue
+        closed[side][idx] = 1
+        current = nodes[idx]
+
+        g_score = g_scores[side]
+        came_from = came_froms[side]
+        potential = potentials[side]
+        other_g = g_scores[1-side]
+        # Assuming the neighbor one unit away is one unit further from the root
+        tmp_g = g_score[idx] + 1
+        for nb in neighbors[idx]:
+            if tmp_g < g_score[nb]:
+                neighbor = nodes[nb]
+                came_from[nb] = idx
+                g_score[nb] = tmp_g
+                count += 1
+                heappush(open_sets[side], (2*tmp_g + potential[nb], count, nb))
+                if neighbor != start and neighbor != end:
                     neighbor.make_open()
-            
-        draw()
+                    dirty.append(neighbor)
+                if tmp_g + other_g[nb] < best:
+                    best = tmp_g + other_g[nb]
+                    meet = nb
 
-        if current != start:
-            # Start node already considered
+        dirty = present(dirty)
+
+        if current != start and current != end:
+            # Start and end keep their colors
             current.make_closed()
-        
-    return False
+            dirty.append(current)
+
+    if meet is None:
+        return False
+
+    paint_path(draw, came_froms, nodes, meet, end, dirty)
+    return True
+
+@dataclass
+class GridState:
+    """The whole grid as flat per-node arrays, all indexed by Node.idx"""
+    rows: int
+    states: bytearray # S_* state of each node
+    walls: bytearray # 1 where the node is a wall
+    nodes: list # Node views over the arrays above, for drawing and editing
+
+    def get_node(self, row, col):
+        return self.nodes[row*self.rows + col]
+
+    def clear(self):
+        """Resets every node to S_DEFAULT in place, nothing is reallocated"""
+        self.states[:] = bytes(len(self.states))
+        self.walls[:] = bytes(len(self.walls))
 
 def make_grid(rows, width):
     """A way to manage all the nodes"""
-    grid = []
+    # Zeroed, so every node starts as S_DEFAULT and no walls
+    states = bytearray(rows*rows)
+    walls = bytearray(rows*rows)
     gap = width // rows
-    for i in range(rows):
-        grid.append([])
-        for j in range(rows):
-            node = Node(i, j, gap, rows)
-            grid[i].append(node)
-    return grid
+    nodes = [Node(i, j, gap, rows, states, walls) for i in range(rows) for j in range(rows)]
+    return GridState(rows, states, walls, nodes)
 
 def draw_grid(screen, rows, width):
     gap = width // rows
@@ -178,19 +489,35 @@ def draw_grid(screen, rows, width):
     for i in range(rows):
         pygame.draw.line(screen, grey, (0, i*gap), (width, i*gap))
     # Draw vertical lines between columns
-        for j in range(rows):
-            pygame.draw.line(screen, grey, (j*gap, 0), (j*gap, width))
-
-def draw(screen, grid, rows, width):
+    for j in range(rows):
+        pygame.draw.line(screen, grey, (j*gap, 0), (j*gap, width))
+
+def make_grid_lines(rows, width):
+    """Draws the grid lines once onto a see-through overlay"""
+    lines = pygame.Surface((width, width))
+    lines.fill(default)
+    lines.set_colorkey(default)
+    draw_grid(lines, rows, width)
+    return lines
+
+def draw_full(screen, grid, lines):
+    """Repaints the whole window"""
     screen.fill(default)
 
-    for row in grid:
-        for spot in row:
-            spot.draw(screen)
-    
-    draw_grid(screen, rows, width)
+    for spot in grid.nodes:
+        spot.draw(screen)
+
+    screen.blit(lines, (0, 0))
     pygame.display.update()
 
+def draw_dirty(screen, dirty, lines):
+    """Repaints and presents only the nodes that changed"""
+    for spot in dirty:
+        spot.draw(screen)
+        # Filling the node covers the grid lines along its edges
+        screen.blit(lines, spot.rect, spot.rect)
+    pygame.display.update([spot.rect for spot in dirty])
+
 def get_clicked_pos(pos, rows, width):
     """Returns which node we've clicked on"""
     gap = width // rows
@@ -204,6 +531,12 @@ def get_clicked_pos(pos, rows, width):
 def main(screen, width):
     ROWS = 40
     grid = make_grid(ROWS, width)
+    lines = make_grid_lines(ROWS, width)
+    draw_full(screen, grid, lines)
+    # Nodes edited since the last frame
+    dirty = []
+    # Built on demand, cleared whenever an edit could move a wall
+    neighbors = None
 
     start = None
     end = None
@@ -212,19 +545,29 @@ def main(screen, width):
     started = False
 
     while run:
-        draw(screen, grid, ROWS, width)
-        for event in pygame.event.get():
+        draw_dirty(screen, dirty, lines)
+        dirty = []
+        events = pygame.event.get()
+        # Button state is only refreshed by the pump inside event.get()
+        pressed = pygame.mouse.get_pressed()
+        for event in events:
             if event.type == pygame.QUIT:
                 run = False
                 sys.exit()
+
+            # The window contents were lost, e.g. after being minimized
+            if event.type == pygame.VIDEOEXPOSE:
+                draw_full(screen, grid, lines)
                         
             # Left mouse button pressed
-            if pygame.mouse.get_pressed()[0]:
+            if pressed[0]:
                 # Get the position of the mouse
                 pos = pygame.mouse.get_pos()
                 # Get the node index which was clicked on
                 row, col = get_clicked_pos(pos, ROWS, width)
-                node = grid[row][col]
+                node = grid.get_node(row, col)
+                neighbors = None
+                dirty.append(node)
                 # User creates the start and end positions first
                 if not start and node != end:
                     start = node
@@ -238,10 +581,12 @@ def main(screen, width):
                     node.make_wall()
 
             # Right mouse button pressed
-            elif pygame.mouse.get_pressed()[2]:
+            elif pressed[2]:
                 pos = pygame.mouse.get_pos()
                 row, col = get_clicked_pos(pos,ROWS, width)
-                node = grid[row][col]
+                node = grid.get_node(row, col)
+                neighbors = None
+                dirty.append(node)
                 node.reset()
                 if node == start:
                     start = None
@@ -251,16 +596,29 @@ def main(screen, width):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and start and end:
                     # Run the algorithm
-                    for row in grid:
-                        for node in row:
-                            node.update_neighbors(grid)
-                    
-                    algorithm(lambda: draw(screen, grid, ROWS, width), grid, start, end)
+                    # Only the plain Python search reads the table, the kernel uses the walls
+                    if astar_nb is None and neighbors is None:
+                        neighbors = build_neighbors(grid.walls, ROWS)
+
+                    cancelled = [False]
+                    algorithm(lambda nodes: draw_dirty(screen, nodes, lines), grid, neighbors, start, end, cancelled)
+                    # The search only checks for QUIT every 64 expansions and not
+                    # while painting the path, so one may still be queued
+                    if cancelled[0] or pygame.event.peek(pygame.QUIT):
+                        # The window was closed during the search
+                        run = False
+                        break
+                    # Mouse and key input made while the search was running is stale by now
+                    pygame.event.clear((pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+                                        pygame.KEYDOWN, pygame.KEYUP))
+                    draw_full(screen, grid, lines)
                 
                 if event.key == pygame.K_c:
                     start = None
                     end = None
-                    grid = make_grid(ROWS, width)
+                    grid.clear()
+                    neighbors = None
+                    draw_full(screen, grid, lines)
 
     sys.exit()
 